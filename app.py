@@ -3,7 +3,6 @@ from twilio.twiml.messaging_response import MessagingResponse
 import psycopg2
 import PyPDF2
 import os
-from sentence_transformers import SentenceTransformer
 import numpy as np
 import re
 from google.oauth2.credentials import Credentials
@@ -13,6 +12,17 @@ from googleapiclient.discovery import build
 import pickle
 import datetime
 import google.generativeai as genai
+from date_parser import parse_date_time, timezone_for_number
+from idempotency import create_store
+from load_control import Metrics, SenderRateLimiter, ConcurrencyLimiter
+from retrieval_sidecar import RetrievalClient
+from encoders import load_encoder
+import conversation
+from conversation import normalize_question
+from faq_index import FaqIndex, FAQ_INDEX_PATH, canonical_questions, file_sha256, is_answered
+from collections import OrderedDict
+import threading
+import time
 
 app = Flask(__name__)
 DB_CONFIG = {
@@ -32,6 +42,56 @@ CALENDAR_ID = 'primary'
 GEMINI_API_KEY = "your_api_keys" 
 genai.configure(api_key=GEMINI_API_KEY)
 
+# Twilio retries slow webhooks with the same MessageSid; replay the first response instead
+IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+IDEMPOTENCY_REDIS_URL = os.environ.get('IDEMPOTENCY_REDIS_URL')
+idempotency_store = create_store(
+    IDEMPOTENCY_REDIS_URL,
+    ttl=IDEMPOTENCY_TTL_SECONDS,
+    pending_response=str(MessagingResponse())
+)
+
+# Question answering limits: per-sender token bucket plus a global cap on
+# embedding/Gemini work. Shed requests get a cached or rule-based answer.
+SENDER_RATE_PER_SECOND = float(os.environ.get('SENDER_RATE_PER_SECOND', '0.2'))
+SENDER_BURST = int(os.environ.get('SENDER_BURST', '5'))
+MAX_CONCURRENT_QUESTIONS = int(os.environ.get('MAX_CONCURRENT_QUESTIONS', '8'))
+MAX_QUEUED_QUESTIONS = int(os.environ.get('MAX_QUEUED_QUESTIONS', '16'))
+QUEUE_TIMEOUT_SECONDS = float(os.environ.get('QUEUE_TIMEOUT_SECONDS', '2'))
+ANSWER_CACHE_SIZE = 512
+
+metrics = Metrics()
+sender_limiter = SenderRateLimiter(rate=SENDER_RATE_PER_SECOND, capacity=SENDER_BURST)
+question_limiter = ConcurrencyLimiter(
+    max_concurrent=MAX_CONCURRENT_QUESTIONS,
+    max_queue=MAX_QUEUED_QUESTIONS,
+    queue_timeout=QUEUE_TIMEOUT_SECONDS
+)
+answer_cache = OrderedDict()
+answer_cache_lock = threading.Lock()
+
+# When set, embedding and search go to the shared retrieval sidecar
+# (python retrieval_sidecar.py) instead of a model loaded in this process
+RETRIEVAL_SOCKET = os.environ.get('RETRIEVAL_SOCKET')
+retrieval_client = RetrievalClient(RETRIEVAL_SOCKET) if RETRIEVAL_SOCKET else None
+worker_initialized = False
+worker_init_lock = threading.Lock()
+# How often sidecar-mode workers look for an FAQ index rewritten by the sidecar
+FAQ_RELOAD_SECONDS = float(os.environ.get('FAQ_RELOAD_SECONDS', '30'))
+faq_checked_at = 0.0
+
+# 'sentence-transformers' (PyTorch), 'onnx' or 'onnx-int8'; see encoders.py
+ENCODER_BACKEND = os.environ.get('ENCODER_BACKEND', 'sentence-transformers')
+
+# Canonical questions answered at ingest time; see faq_index.py
+PDF_PATH = "invock.pdf"
+# Gemini writes the FAQ answers when a key is configured; otherwise only
+# questions with a matching generate_rule_based_answer rule are stored
+FAQ_USE_LLM = os.environ.get('FAQ_USE_LLM', '0' if GEMINI_API_KEY == "your_api_keys" else '1') == '1'
+FAQ_MATCH_THRESHOLD = float(os.environ.get('FAQ_MATCH_THRESHOLD', '0.85'))
+faq_index = None
+faq_index_mtime = None
+
 def extract_pdf_text(pdf_path):
     global pdf_text
     try:
@@ -57,11 +117,18 @@ def chunk_text(text, chunk_size=500, overlap=50):
     
     return chunks
 
-def initialize_pdf_processing():
-    """Initialize PDF processing and embeddings"""
+def initialize_pdf_processing(load_model=True, encoder_threads=None, rebuild_faq=False):
+    """Initialize PDF processing and embeddings
+
+    With load_model=False only the chunk text is prepared; embedding and
+    search are left to the retrieval sidecar. encoder_threads overrides the
+    ONNX Runtime thread count, which otherwise assumes WEB_CONCURRENCY
+    workers share the machine. rebuild_faq rebuilds the FAQ index even if
+    the saved one is current.
+    """
     global pdf_chunks, pdf_embeddings, model
     
-    pdf_path = "invock.pdf"
+    pdf_path = PDF_PATH
     if not os.path.exists(pdf_path):
         print(f"PDF file {pdf_path} not found!")
         return False
@@ -73,15 +140,72 @@ def initialize_pdf_processing():
     
     pdf_chunks = chunk_text(text)
 
+    if not load_model:
+        print(f"Loaded {len(pdf_chunks)} chunks, using retrieval sidecar for search")
+        load_faq_index(pdf_path)
+        return True
 
     try:
-        model = SentenceTransformer('all-MiniLM-L6-v2')
+        model = load_encoder(ENCODER_BACKEND, threads=encoder_threads)
         pdf_embeddings = model.encode(pdf_chunks)
         print(f"Successfully processed PDF with {len(pdf_chunks)} chunks")
-        return True
     except Exception as e:
         print(f"Error initializing model: {e}")
         return False
+    
+    load_faq_index(pdf_path, rebuild=rebuild_faq)
+    return True
+
+def load_faq_index(pdf_path, rebuild=False):
+    """Load the FAQ index for pdf_path, rebuilding it if the PDF or encoder changed"""
+    global faq_index, faq_index_mtime
+    
+    # Remembered even when the file is missing or stale, so sidecar-mode
+    # workers only retry once the sidecar has written a new one
+    faq_index_mtime = faq_index_file_mtime()
+    source_sha256 = file_sha256(pdf_path)
+    # Rebuild when the encoder or the way answers are written changes
+    built_with = f"{ENCODER_BACKEND}/{'gemini' if FAQ_USE_LLM else 'rules'}"
+    if not rebuild and os.path.exists(FAQ_INDEX_PATH):
+        try:
+            index = FaqIndex.load(FAQ_INDEX_PATH)
+            if index.is_current(source_sha256, built_with):
+                faq_index = index
+                print(f"Loaded FAQ index with {len(index.entries)} entries")
+                return
+        except Exception as e:
+            print(f"Error loading FAQ index: {e}")
+    
+    if model is None:
+        # Workers using the retrieval sidecar leave building to the sidecar
+        print("FAQ index is missing or out of date and no local model is loaded to rebuild it")
+        return
+    
+    def answer_faq(question):
+        # No generic extracts: they would stand in for Gemini on every close match
+        relevant_chunks = find_relevant_chunks(question)
+        if FAQ_USE_LLM:
+            answer = generate_answer(question, relevant_chunks, fallback=False)
+        else:
+            answer = generate_rule_based_answer(question, relevant_chunks)
+        return answer, [chunk['index'] for chunk in relevant_chunks]
+    
+    try:
+        print("Building FAQ index...")
+        index = FaqIndex.build(canonical_questions(pdf_path), answer_faq, model.encode,
+                               source_sha256, built_with)
+        index.save(FAQ_INDEX_PATH)
+        faq_index = index
+        faq_index_mtime = faq_index_file_mtime()
+        print(f"Built FAQ index with {len(index.entries)} entries")
+    except Exception as e:
+        print(f"Error building FAQ index: {e}")
+
+def faq_index_file_mtime():
+    try:
+        return os.stat(FAQ_INDEX_PATH).st_mtime_ns
+    except OSError:
+        return None
 
 def cosine_similarity(a, b):
     dot_product = np.dot(a, b)
@@ -89,54 +213,186 @@ def cosine_similarity(a, b):
     norm_b = np.linalg.norm(b)
     return dot_product / (norm_a * norm_b)
 
-def find_relevant_chunks(question, top_k=5):
+def select_relevant_chunks(similarities, top_k=5):
+    top_indices = np.argsort(similarities)[-top_k:][::-1]
+    
+    relevant_chunks = []
+    for idx in top_indices:
+        if similarities[idx] > 0.2:  # Lower threshold for more context
+            relevant_chunks.append({
+                'index': int(idx),
+                'text': pdf_chunks[idx],
+                'similarity': similarities[idx]
+            })
+    
+    if not relevant_chunks and len(pdf_chunks) > 0:
+        for idx in top_indices[:2]:
+            relevant_chunks.append({
+                'index': int(idx),
+                'text': pdf_chunks[idx],
+                'similarity': similarities[idx]
+            })
+    
+    return relevant_chunks
+
+def embed_question(question):
+    """Question embedding from the local model, or None in sidecar mode"""
+    if model is None or retrieval_client is not None:
+        return None
+    try:
+        return model.encode([question])[0]
+    except Exception as e:
+        print(f"Error embedding question: {e}")
+        return None
+
+def find_relevant_chunks(question, top_k=5, question_embedding=None):
     global model, pdf_chunks, pdf_embeddings
     
+    if retrieval_client is not None:
+        try:
+            return retrieval_client.search(question, top_k)
+        except Exception as e:
+            # Keep answering from keyword matches while the sidecar is down or busy
+            print(f"Error querying retrieval sidecar: {e}")
+            metrics.inc('retrieval_sidecar_errors')
+            return find_keyword_chunks(question, top_k)
+    
     if model is None or pdf_embeddings is None:
         return []
     
     try:
-        question_embedding = model.encode([question])[0]
+        if question_embedding is None:
+            question_embedding = model.encode([question])[0]
         
         similarities = []
         for chunk_embedding in pdf_embeddings:
             sim = cosine_similarity(question_embedding, chunk_embedding)
             similarities.append(sim)
         
-        similarities = np.array(similarities)
-        
-        top_indices = np.argsort(similarities)[-top_k:][::-1]
-        
-        relevant_chunks = []
-        for idx in top_indices:
-            if similarities[idx] > 0.2:  # Lower threshold for more context
-                relevant_chunks.append({
-                    'text': pdf_chunks[idx],
-                    'similarity': similarities[idx]
-                })
-        
-        if not relevant_chunks and len(pdf_chunks) > 0:
-            for idx in top_indices[:2]:
-                relevant_chunks.append({
-                    'text': pdf_chunks[idx],
-                    'similarity': similarities[idx]
-                })
-        
-        return relevant_chunks
+        return select_relevant_chunks(np.array(similarities), top_k)
     except Exception as e:
         print(f"Error finding relevant chunks: {e}")
         return []
 
-def generate_answer(question, relevant_chunks):
+def find_keyword_chunks(question, top_k=2):
+    """Cheap word-overlap ranking used when there is no capacity for embedding"""
+    question_words = set(re.findall(r'\w{3,}', question.lower()))
+    scored = []
+    for idx, chunk in enumerate(pdf_chunks):
+        overlap = len(question_words & set(re.findall(r'\w{3,}', chunk.lower())))
+        if overlap:
+            scored.append((overlap, idx, chunk))
+    
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [{'index': idx, 'text': chunk, 'similarity': 0.0} for _, idx, chunk in scored[:top_k]]
+
+def get_cached_answer(question):
+    key = normalize_question(question)
+    with answer_cache_lock:
+        answer = answer_cache.get(key)
+        if answer is not None:
+            answer_cache.move_to_end(key)
+        return answer
+
+def cache_answer(question, answer):
+    key = normalize_question(question)
+    with answer_cache_lock:
+        answer_cache[key] = answer
+        answer_cache.move_to_end(key)
+        if len(answer_cache) > ANSWER_CACHE_SIZE:
+            answer_cache.popitem(last=False)
+
+def find_faq_entry(question, question_embedding=None):
+    """Stored FAQ answer matching question exactly or by embedding similarity"""
+    if faq_index is None:
+        return None
+    entry = faq_index.lookup(question)
+    if entry is None and question_embedding is not None:
+        entry = faq_index.match(question_embedding, FAQ_MATCH_THRESHOLD)
+    return entry
+
+def match_faq_entry(question, question_embedding):
+    """find_faq_entry with similarity matching, done by the sidecar when it owns the model"""
+    if retrieval_client is None:
+        return find_faq_entry(question, question_embedding)
+    try:
+        return retrieval_client.match_faq(question)
+    except Exception as e:
+        print(f"Error matching FAQ via retrieval sidecar: {e}")
+        metrics.inc('retrieval_sidecar_errors')
+        return None
+
+def answer_from_faq(entry, question, history):
+    metrics.inc('questions_faq_hit')
+    chunks = [{'index': idx} for idx in entry['chunk_ids']]
+    conversation.record_turn(history, question, entry['answer'], chunks)
+    return entry['answer']
+
+def answer_question(question, history):
+    """Answer a question_mode message using the session's recent history"""
+    repeat = conversation.find_repeat(question, history)
+    if repeat is not None:
+        metrics.inc('questions_repeated')
+        return repeat['answer']
+    
+    query, reuse_chunk_ids, follow_up = conversation.plan_retrieval(question, history)
+    
+    # FAQ answers don't depend on earlier turns, so follow-ups skip them
+    if not follow_up:
+        entry = find_faq_entry(question)
+        if entry is not None:
+            return answer_from_faq(entry, question, history)
+    
+    with question_limiter.slot() as admitted:
+        if admitted:
+            if reuse_chunk_ids:
+                metrics.inc('questions_reused_chunks')
+                relevant_chunks = [{'index': idx, 'text': pdf_chunks[idx], 'similarity': 0.0}
+                                   for idx in reuse_chunk_ids if idx < len(pdf_chunks)]
+            else:
+                question_embedding = embed_question(query)
+                entry = None if follow_up else match_faq_entry(question, question_embedding)
+                if entry is not None:
+                    return answer_from_faq(entry, question, history)
+                relevant_chunks = find_relevant_chunks(query, question_embedding=question_embedding)
+            answer = generate_answer(question, relevant_chunks, history)
+            # Follow-ups only make sense within this conversation, and
+            # "couldn't find" answers are worth retrying rather than replaying
+            replayable = not follow_up and is_answered(answer)
+            if replayable:
+                cache_answer(question, answer)
+            conversation.record_turn(history, question, answer, relevant_chunks, replayable)
+            return answer
+    
+    print("Question capacity exhausted, shedding load")
+    metrics.inc('questions_shed')
+    answer = get_cached_answer(query)
+    if answer is not None:
+        metrics.inc('questions_shed_cache_hit')
+        return answer
+    relevant_chunks = find_keyword_chunks(query)
+    answer = generate_smart_fallback_answer(question, relevant_chunks)
+    # A degraded answer must not be replayed, nor its keyword chunks reused, once load drops
+    conversation.record_turn(history, question, answer, relevant_chunks, replayable=False, degraded=True)
+    return answer
+
+def generate_answer(question, relevant_chunks, history=None, fallback=True):
     if not relevant_chunks:
         return "I'm sorry, I couldn't find relevant information in the PDF to answer your question."
     
     try:
         context = " ".join([chunk['text'] for chunk in relevant_chunks])
         
+        recent_conversation = ""
+        if history:
+            recent_conversation = f"""
+        Recent conversation (use it to understand what the question refers to):
+        {conversation.format_for_prompt(history)}
+"""
+        
         prompt = f"""
         You are an AI assistant that answers questions based on PDF content. Please answer the following question using ONLY the information provided in the context below.
-
+{recent_conversation}
         Question: {question}
 
         PDF Context:
@@ -167,12 +423,15 @@ def generate_answer(question, relevant_chunks):
         
     except Exception as e:
         print(f"Error generating answer with Gemini: {e}")
+        if not fallback:
+            return None
         # Fallback to smart answer generation
         return generate_smart_fallback_answer(question, relevant_chunks)
 
-def generate_smart_fallback_answer(question, relevant_chunks):
+def generate_rule_based_answer(question, relevant_chunks):
+    """Answer from the rule for this kind of question, or None if no rule matches"""
     if not relevant_chunks:
-        return "I'm sorry, I couldn't find relevant information in the PDF to answer your question."
+        return None
     
     context = " ".join([chunk['text'] for chunk in relevant_chunks])
     
@@ -238,6 +497,19 @@ def generate_smart_fallback_answer(question, relevant_chunks):
             if cleaned_benefits:
                 return "Benefits according to the PDF: " + ". ".join(cleaned_benefits) + "."
     
+    return None
+
+def generate_smart_fallback_answer(question, relevant_chunks):
+    if not relevant_chunks:
+        return "I'm sorry, I couldn't find relevant information in the PDF to answer your question."
+    
+    answer = generate_rule_based_answer(question, relevant_chunks)
+    if answer:
+        return answer
+    
+    context = " ".join([chunk['text'] for chunk in relevant_chunks])
+    context = re.sub(r'\s+', ' ', context).strip()
+    
     sentences = re.split(r'[.!?]+', context)
     meaningful_sentences = [s.strip() for s in sentences if len(s.strip()) > 20]
     
@@ -305,76 +577,25 @@ def get_google_calendar_service():
         print(f"Error building calendar service: {e}")
         return None
 
-def parse_date_time(date_str, time_str):
-    try:
-        date_str = date_str.strip().lower()
-        time_str = time_str.strip().lower()
-        
-        now = datetime.datetime.now()
-        
-        if 'monday' in date_str or 'mon' in date_str:
-            target_date = now + datetime.timedelta(days=(0 - now.weekday()) % 7)
-        elif 'tuesday' in date_str or 'tue' in date_str:
-            target_date = now + datetime.timedelta(days=(1 - now.weekday()) % 7)
-        elif 'wednesday' in date_str or 'wed' in date_str:
-            target_date = now + datetime.timedelta(days=(2 - now.weekday()) % 7)
-        elif 'thursday' in date_str or 'thu' in date_str:
-            target_date = now + datetime.timedelta(days=(3 - now.weekday()) % 7)
-        elif 'friday' in date_str or 'fri' in date_str:
-            target_date = now + datetime.timedelta(days=(4 - now.weekday()) % 7)
-        elif 'saturday' in date_str or 'sat' in date_str:
-            target_date = now + datetime.timedelta(days=(5 - now.weekday()) % 7)
-        elif 'sunday' in date_str or 'sun' in date_str:
-            target_date = now + datetime.timedelta(days=(6 - now.weekday()) % 7)
-        else:
-            for fmt in ['%d %B', '%d %b', '%B %d', '%b %d', '%d/%m', '%m/%d']:
-                try:
-                    target_date = datetime.datetime.strptime(date_str, fmt)
-                    target_date = target_date.replace(year=now.year)
-                    if target_date < now:
-                        target_date = target_date.replace(year=now.year + 1)
-                    break
-                except ValueError:
-                    continue
-        else:
-                target_date = now + datetime.timedelta(days=1)
-        
-        time_str = time_str.replace('am', ' AM').replace('pm', ' PM')
-        for fmt in ['%I:%M %p', '%I %p', '%H:%M', '%H']:
-            try:
-                time_obj = datetime.datetime.strptime(time_str, fmt).time()
-                break
-            except ValueError:
-                continue
-        else:
-            
-            time_obj = datetime.time(10, 0)
-        
-        event_datetime = datetime.datetime.combine(target_date.date(), time_obj)
-        
-        return event_datetime
-    except Exception as e:
-        print(f"Error parsing date/time: {e}")
-        return datetime.datetime.now() + datetime.timedelta(days=1, hours=10)
-
-def create_calendar_event(name, email, business_name, demo_date, demo_time):
+def create_calendar_event(name, email, business_name, demo_date, demo_time, from_number=''):
     try:
         service = get_google_calendar_service()
         if not service:
             return False, "Failed to authenticate with Google Calendar"
         
-        event_datetime = parse_date_time(demo_date, demo_time)
+        timezone_name = timezone_for_number(from_number)
+        event_datetime = parse_date_time(demo_date, demo_time, timezone_name)
         
         event = {
             'summary': f'Demo Meeting - {business_name}',
             'description': f'Demo meeting with {name} from {business_name}\nEmail: {email}\nDemo Date: {demo_date}\nDemo Time: {demo_time}',
             'start': {
                 'dateTime': event_datetime.isoformat(),
-                'timeZone': 'UTC',
+                'timeZone': timezone_name,
             },
             'end': {
                 'dateTime': (event_datetime + datetime.timedelta(hours=1)).isoformat(),
-                'timeZone': 'UTC',
+                'timeZone': timezone_name,
             },
             'attendees': [
                 {'email': email},
@@ -408,13 +629,58 @@ def save_user_data(name, email, business_name, demo_date=None, demo_time=None):
     cursor.close()
     conn.close()
 
+@app.before_request
+def initialize_worker():
+    """Load chunk text and the FAQ index in sidecar-mode workers.
+
+    gunicorn imports app:app without running __main__, so each worker does
+    this on its first request instead. Every FAQ_RELOAD_SECONDS it checks
+    whether the sidecar has written a new FAQ index (after starting up or
+    rebuilding for a changed PDF) and reloads the chunks and the index.
+    """
+    global worker_initialized, faq_checked_at
+    
+    if retrieval_client is None:
+        return
+    if worker_initialized and time.monotonic() - faq_checked_at < FAQ_RELOAD_SECONDS:
+        return
+    with worker_init_lock:
+        if not worker_initialized:
+            if not pdf_chunks:
+                initialize_pdf_processing(load_model=False)
+            worker_initialized = True
+        elif time.monotonic() - faq_checked_at >= FAQ_RELOAD_SECONDS:
+            if faq_index_file_mtime() != faq_index_mtime:
+                print("FAQ index changed on disk, reloading")
+                initialize_pdf_processing(load_model=False)
+        faq_checked_at = time.monotonic()
+
 @app.route('/webhook', methods=['POST'])
 def webhook():
     incoming_msg = request.values.get('Body', '').strip()
     from_number = request.values.get('From', '')
+    message_sid = request.values.get('MessageSid', '')
+    
+    print(f"Received message {message_sid} from {from_number}: {incoming_msg}")
+    
+    if not message_sid:
+        return handle_message(incoming_msg, from_number)
     
-    print(f"Received message from {from_number}: {incoming_msg}")
+    cached_response = idempotency_store.begin(message_sid)
+    if cached_response is not None:
+        print(f"Duplicate delivery of {message_sid}, replaying response")
+        return cached_response
     
+    try:
+        response = handle_message(incoming_msg, from_number)
+    except Exception:
+        idempotency_store.abandon(message_sid)
+        raise
+    
+    idempotency_store.complete(message_sid, response)
+    return response
+
+def handle_message(incoming_msg, from_number):
     resp = MessagingResponse()
     msg = resp.message()
     
@@ -501,7 +767,8 @@ def webhook():
                     session['data']['email'],
                     session['data']['business_name'],
                     session['data']['demo_date'],
-                    session['data']['demo_time']
+                    session['data']['demo_time'],
+                    from_number
                 )
                 print(f"Calendar creation result: {calendar_success}, {calendar_message}")
                 
@@ -526,10 +793,14 @@ def webhook():
             elif incoming_msg.lower() in ['demo', 'schedule demo', 'book demo', 'demo meeting']:
                 session['step'] = 'demo_date'
                 msg.body("Great! Let's schedule a demo meeting. What is your preferred date for the demo? (e.g., Monday, Tuesday, or specific date like 15th March)")
+            elif not sender_limiter.allow(from_number):
+                print(f"Rate limit exceeded for {from_number}")
+                metrics.inc('questions_rate_limited')
+                msg.body("You're sending questions faster than I can answer them. Please wait a moment and try again.")
             else:
-                relevant_chunks = find_relevant_chunks(incoming_msg)
-                answer = generate_answer(incoming_msg, relevant_chunks)
-                msg.body(answer)
+                metrics.inc('questions_received')
+                history = session.setdefault('history', conversation.new_history())
+                msg.body(answer_question(incoming_msg, history))
     
     print(f"Sending response: {msg.body}")
     return str(resp)
@@ -538,11 +809,19 @@ def webhook():
 def health_check():
     return {'status': 'healthy', 'pdf_loaded': len(pdf_chunks) > 0}
 
+@app.route('/metrics', methods=['GET'])
+def metrics_report():
+    return {
+        'counters': metrics.snapshot(),
+        'questions_in_flight': question_limiter.in_flight,
+        'questions_waiting': question_limiter.waiting
+    }
+
 if __name__ == '__main__':
     create_table()
     
     print("Initializing PDF processing...")
-    if initialize_pdf_processing():
+    if initialize_pdf_processing(load_model=retrieval_client is None):
         print("PDF processing initialized successfully!")
     else:
         print("Warning: PDF processing failed to initialize!")
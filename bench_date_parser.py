@@ -0,0 +1,102 @@
+"""Compare the table-driven date parser against the old strptime chain.
+
+Run with: python bench_date_parser.py
+"""
+import datetime
+import timeit
+
+from date_parser import parse_date_time, _parse_cached
+
+SAMPLES = [
+    ('Monday', '10:00 AM'),
+    ('next friday', '2:30 PM'),
+    ('tomorrow', '3pm'),
+    ('15th March', '11 am'),
+    ('March 15', '14:00'),
+    ('15/03', '9'),
+    ('this month', 'noon'),
+    ('sunny day', 'whenever'),
+]
+
+
+def legacy_parse_date_time(date_str, time_str):
+    # Previous implementation, kept verbatim apart from the misplaced
+    # 'else' that stopped it compiling.
+    try:
+        date_str = date_str.strip().lower()
+        time_str = time_str.strip().lower()
+
+        now = datetime.datetime.now()
+
+        if 'monday' in date_str or 'mon' in date_str:
+            target_date = now + datetime.timedelta(days=(0 - now.weekday()) % 7)
+        elif 'tuesday' in date_str or 'tue' in date_str:
+            target_date = now + datetime.timedelta(days=(1 - now.weekday()) % 7)
+        elif 'wednesday' in date_str or 'wed' in date_str:
+            target_date = now + datetime.timedelta(days=(2 - now.weekday()) % 7)
+        elif 'thursday' in date_str or 'thu' in date_str:
+            target_date = now + datetime.timedelta(days=(3 - now.weekday()) % 7)
+        elif 'friday' in date_str or 'fri' in date_str:
+            target_date = now + datetime.timedelta(days=(4 - now.weekday()) % 7)
+        elif 'saturday' in date_str or 'sat' in date_str:
+            target_date = now + datetime.timedelta(days=(5 - now.weekday()) % 7)
+        elif 'sunday' in date_str or 'sun' in date_str:
+            target_date = now + datetime.timedelta(days=(6 - now.weekday()) % 7)
+        else:
+            for fmt in ['%d %B', '%d %b', '%B %d', '%b %d', '%d/%m', '%m/%d']:
+                try:
+                    target_date = datetime.datetime.strptime(date_str, fmt)
+                    target_date = target_date.replace(year=now.year)
+                    if target_date < now:
+                        target_date = target_date.replace(year=now.year + 1)
+                    break
+                except ValueError:
+                    continue
+            else:
+                target_date = now + datetime.timedelta(days=1)
+
+        time_str = time_str.replace('am', ' AM').replace('pm', ' PM')
+        for fmt in ['%I:%M %p', '%I %p', '%H:%M', '%H']:
+            try:
+                time_obj = datetime.datetime.strptime(time_str, fmt).time()
+                break
+            except ValueError:
+                continue
+        else:
+            time_obj = datetime.time(10, 0)
+
+        return datetime.datetime.combine(target_date.date(), time_obj)
+    except Exception as e:
+        print(f"Error parsing date/time: {e}")
+        return datetime.datetime.now() + datetime.timedelta(days=1, hours=10)
+
+
+def run_all(parse):
+    for date_str, time_str in SAMPLES:
+        parse(date_str, time_str)
+
+
+def uncached_parse(date_str, time_str):
+    _parse_cached.cache_clear()
+    return parse_date_time(date_str, time_str)
+
+
+def main(number=2000):
+    print(f"{'input':<28} {'legacy':<20} new")
+    for date_str, time_str in SAMPLES:
+        old = legacy_parse_date_time(date_str, time_str)
+        new = parse_date_time(date_str, time_str)
+        label = f"{date_str} / {time_str}"
+        print(f"{label:<28} {old:%a %d %b %H:%M}     {new:%a %d %b %H:%M}")
+
+    print()
+    for name, parse in [('legacy', legacy_parse_date_time),
+                        ('table-driven (cold)', uncached_parse),
+                        ('table-driven (cached)', parse_date_time)]:
+        seconds = min(timeit.repeat(lambda: run_all(parse), number=number, repeat=3))
+        per_call = seconds / (number * len(SAMPLES)) * 1e6
+        print(f"{name:<24} {per_call:8.2f} us/call")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Compare encoder backends on invock.pdf: parity with SentenceTransformer and latency.
+
+Run with: python bench_encoder.py [--threads N] [--repeat N]
+Fails with a non-zero exit if a backend's embeddings drift below --min-cosine.
+"""
+import time
+import argparse
+
+import numpy as np
+
+from app import extract_pdf_text, chunk_text
+from encoders import BACKENDS, load_encoder, embedding_parity
+
+QUESTIONS = [
+    "What is Invock?",
+    "What features does Invock offer?",
+    "How does inventory management work?",
+    "Does it support GST billing?",
+    "How much does it cost?",
+    "Can I use it on mobile?",
+    "How can Invock help my business improve efficiency?",
+    "Who do I contact for support?",
+]
+
+
+def top_chunks(question_embeddings, chunk_embeddings, top_k=5):
+    questions = question_embeddings / np.linalg.norm(question_embeddings, axis=1, keepdims=True)
+    chunks = chunk_embeddings / np.linalg.norm(chunk_embeddings, axis=1, keepdims=True)
+    return np.argsort(questions @ chunks.T, axis=1)[:, ::-1][:, :top_k]
+
+
+def latency_ms(encoder, repeat):
+    timings = []
+    for _ in range(repeat):
+        for question in QUESTIONS:
+            start = time.perf_counter()
+            encoder.encode([question])
+            timings.append((time.perf_counter() - start) * 1000)
+    return np.percentile(timings, 50), np.percentile(timings, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--min-cosine', type=float, default=0.98)
+    args = parser.parse_args()
+
+    chunks = chunk_text(extract_pdf_text('invock.pdf'))
+    texts = chunks + QUESTIONS
+
+    reference = None
+    reference_top = None
+    failed = False
+    print(f"{'backend':<22} {'load s':>7} {'p50 ms':>7} {'p95 ms':>7} {'min cos':>8} {'top5 overlap':>13}")
+    for backend in BACKENDS:
+        start = time.perf_counter()
+        encoder = load_encoder(backend, threads=args.threads)
+        load_seconds = time.perf_counter() - start
+
+        embeddings = np.asarray(encoder.encode(texts))
+        ranking = top_chunks(embeddings[len(chunks):], embeddings[:len(chunks)])
+        if reference is None:
+            reference, reference_top = embeddings, ranking
+
+        min_cosine = embedding_parity(reference, embeddings).min()
+        overlap = np.mean([len(set(a) & set(b)) / len(a) for a, b in zip(reference_top, ranking)])
+        # Warm up before timing
+        encoder.encode(QUESTIONS)
+        p50, p95 = latency_ms(encoder, args.repeat)
+
+        print(f"{backend:<22} {load_seconds:7.2f} {p50:7.2f} {p95:7.2f} {min_cosine:8.4f} {overlap:13.2%}")
+        if min_cosine < args.min_cosine:
+            print(f"  {backend} embeddings diverge from sentence-transformers (min cosine {min_cosine:.4f})")
+            failed = True
+
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
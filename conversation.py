@@ -0,0 +1,101 @@
+"""Rolling per-session history used to handle follow-up questions cheaply.
+
+Each turn keeps the question, the answer and the ids of the chunks the
+answer was built from. A follow-up that introduces nothing new reuses
+the previous chunks instead of searching again, unless those chunks came
+from a shed (degraded) turn's keyword match. One that does add
+something is searched together with the previous question, so that
+"how much does it cost?" is looked up with the product it refers to.
+An exact repeat of a recent self-contained question returns the earlier
+answer, as long as that answer was a full one (not shed or unanswered).
+"""
+import re
+from collections import deque
+
+HISTORY_TURNS = 4
+MAX_FOLLOW_UP_WORDS = 8
+PROMPT_TURNS = 2
+
+FOLLOW_UP_PRONOUNS = {
+    'it', 'its', 'that', 'this', 'those', 'these', 'they', 'them', 'their', 'there', 'one', 'ones',
+}
+FOLLOW_UP_PREFIXES = ('and ', 'also ', 'so ', 'then ', 'what about', 'how about', 'what else')
+STOPWORDS = {
+    'the', 'and', 'for', 'are', 'was', 'were', 'you', 'your', 'what', 'which', 'who', 'whom', 'how',
+    'why', 'when', 'where', 'does', 'did', 'can', 'could', 'would', 'should', 'will', 'with', 'about',
+    'tell', 'more', 'much', 'many', 'also', 'then', 'else', 'any', 'some', 'have', 'has', 'had', 'get',
+    'please', 'explain', 'detail', 'details', 'from', 'into', 'use', 'there', 'that', 'this', 'those',
+    'these', 'they', 'them', 'their', 'its', 'one', 'ones', 'is', 'do', 'me', 'be',
+}
+
+
+def new_history():
+    return deque(maxlen=HISTORY_TURNS)
+
+
+def normalize_question(question):
+    return re.sub(r'[^\w\s]', '', question.lower()).strip()
+
+
+def content_words(text):
+    return {word for word in re.findall(r'[a-z0-9]{3,}', text.lower()) if word not in STOPWORDS}
+
+
+def is_follow_up(question):
+    text = question.lower().strip()
+    words = re.findall(r"[a-z0-9']+", text)
+    if not words or len(words) > MAX_FOLLOW_UP_WORDS:
+        return False
+    return text.startswith(FOLLOW_UP_PREFIXES) or any(word in FOLLOW_UP_PRONOUNS for word in words)
+
+
+def find_repeat(question, history):
+    """Return the most recent replayable turn that asked exactly this question.
+
+    Follow-ups are never replayed: "how much does it cost?" depends on
+    what "it" was at the time.
+    """
+    if is_follow_up(question):
+        return None
+    normalized = normalize_question(question)
+    for turn in reversed(history):
+        if turn.get('replayable') and normalize_question(turn['question']) == normalized:
+            return turn
+    return None
+
+
+def plan_retrieval(question, history):
+    """Decide how to retrieve context for question.
+
+    Returns (search_query, reuse_chunk_ids, follow_up). follow_up is only
+    True when there is history to follow up on; a first message such as
+    "How much does it cost?" stands on its own. reuse_chunk_ids is set when
+    the question stays on the previous turn's topic and no search is needed;
+    a degraded previous turn only had keyword matches, so it is searched again.
+    """
+    if not history or not is_follow_up(question):
+        return question, None, False
+
+    previous = history[-1]
+    new_words = content_words(question) - content_words(previous['question'] + ' ' + previous['answer'])
+    if not new_words and previous['chunk_ids'] and not previous.get('degraded'):
+        return question, previous['chunk_ids'], True
+    return f"{previous['question']} {question}", None, True
+
+
+def record_turn(history, question, answer, relevant_chunks, replayable=True, degraded=False):
+    history.append({
+        'question': question,
+        'answer': answer,
+        'chunk_ids': [chunk['index'] for chunk in relevant_chunks if 'index' in chunk],
+        'replayable': replayable,
+        'degraded': degraded
+    })
+
+
+def format_for_prompt(history):
+    lines = []
+    for turn in list(history)[-PROMPT_TURNS:]:
+        lines.append(f"User: {turn['question']}")
+        lines.append(f"Assistant: {turn['answer']}")
+    return "\n".join(lines)
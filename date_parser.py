@@ -0,0 +1,227 @@
+import re
+import datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DEFAULT_TIMEZONE = 'UTC'
+DEFAULT_TIME = datetime.time(10, 0)
+PARSE_CACHE_SIZE = 1024
+
+# Dialling code -> IANA timezone used for the demo calendar event.
+# Countries spanning several zones map to their most populated one.
+COUNTRY_TIMEZONES = {
+    '1': 'America/New_York',
+    '7': 'Europe/Moscow',
+    '27': 'Africa/Johannesburg',
+    '33': 'Europe/Paris',
+    '34': 'Europe/Madrid',
+    '39': 'Europe/Rome',
+    '44': 'Europe/London',
+    '49': 'Europe/Berlin',
+    '55': 'America/Sao_Paulo',
+    '61': 'Australia/Sydney',
+    '62': 'Asia/Jakarta',
+    '63': 'Asia/Manila',
+    '65': 'Asia/Singapore',
+    '81': 'Asia/Tokyo',
+    '86': 'Asia/Shanghai',
+    '91': 'Asia/Kolkata',
+    '92': 'Asia/Karachi',
+    '234': 'Africa/Lagos',
+    '880': 'Asia/Dhaka',
+    '971': 'Asia/Dubai',
+}
+
+WEEKDAYS = {
+    'monday': 0, 'mon': 0,
+    'tuesday': 1, 'tues': 1, 'tue': 1,
+    'wednesday': 2, 'wed': 2,
+    'thursday': 3, 'thurs': 3, 'thur': 3, 'thu': 3,
+    'friday': 4, 'fri': 4,
+    'saturday': 5, 'sat': 5,
+    'sunday': 6, 'sun': 6,
+}
+
+MONTHS = {
+    'january': 1, 'jan': 1,
+    'february': 2, 'feb': 2,
+    'march': 3, 'mar': 3,
+    'april': 4, 'apr': 4,
+    'may': 5,
+    'june': 6, 'jun': 6,
+    'july': 7, 'jul': 7,
+    'august': 8, 'aug': 8,
+    'september': 9, 'sept': 9, 'sep': 9,
+    'october': 10, 'oct': 10,
+    'november': 11, 'nov': 11,
+    'december': 12, 'dec': 12,
+}
+
+RELATIVE_DAYS = {
+    'today': 0,
+    'tonight': 0,
+    'tomorrow': 1,
+    'tmrw': 1,
+    'tmr': 1,
+    'day after tomorrow': 2,
+}
+
+
+def _alternation(words):
+    # Longest first so 'thursday' wins over 'thu'
+    return '|'.join(sorted((re.escape(w) for w in words), key=len, reverse=True))
+
+
+_WEEKDAY = _alternation(WEEKDAYS)
+_MONTH = _alternation(MONTHS)
+_RELATIVE = _alternation(RELATIVE_DAYS).replace(r'\ ', r'\s+')
+_ORDINAL = r'(?:st|nd|rd|th)?'
+
+_DATE_RE = re.compile(rf"""
+    \b(?:
+        (?P<relative>{_RELATIVE})
+      | (?P<in_days>in\s+(?P<offset>\d{{1,2}})\s+days?)
+      | (?:(?P<next>next|coming)\s+)?(?:this\s+)?(?P<weekday>{_WEEKDAY})
+      | (?P<dm_day>\d{{1,2}}){_ORDINAL}\s*(?:of\s+)?(?P<dm_month>{_MONTH})
+      | (?P<md_month>{_MONTH})\.?\s+(?P<md_day>\d{{1,2}}){_ORDINAL}
+      | (?P<num_a>\d{{1,2}})[/.-](?P<num_b>\d{{1,2}})(?:[/.-](?P<num_year>\d{{2}}|\d{{4}}))?
+    )\b
+""", re.VERBOSE)
+
+# am/pm times and named times are found anywhere in the message; a bare
+# 24-hour time is only trusted when it is the whole message, so stray
+# numbers ("in 2 hours", "at 3") don't become early-morning slots
+_MERIDIEM_TIME_RE = re.compile(r"""
+    \b(?P<hour>\d{1,2})(?:\s*[:.\s]\s*(?P<minute>\d{2}))?\s*
+    (?:(?P<meridiem>[ap])\.?\s*m\b\.?|(?:in\s+the\s+|at\s+)?(?P<day_part>morning|afternoon|evening|night)\b)
+""", re.VERBOSE)
+_NAMED_TIME_RE = re.compile(r'\b(?P<named>noon|midday|midnight)\b')
+_BARE_TIME_RE = re.compile(r'(?P<hour>\d{1,2})(?:[:.](?P<minute>\d{2}))?(?:\s*hrs)?')
+
+_DAY_PART_MERIDIEM = {
+    'morning': 'a',
+    'afternoon': 'p',
+    'evening': 'p',
+    'night': 'p',
+}
+
+_NAMED_TIMES = {
+    'noon': datetime.time(12, 0),
+    'midday': datetime.time(12, 0),
+    'midnight': datetime.time(0, 0),
+}
+
+
+def timezone_for_number(from_number):
+    """Map a WhatsApp sender such as 'whatsapp:+919876543210' to a timezone name."""
+    digits = re.sub(r'\D', '', from_number or '')
+    for length in (3, 2, 1):
+        tz_name = COUNTRY_TIMEZONES.get(digits[:length])
+        if tz_name:
+            return tz_name
+    return DEFAULT_TIMEZONE
+
+
+def _upcoming(today, month, day):
+    """Next occurrence of month/day on or after today, or None if invalid."""
+    for year in (today.year, today.year + 1):
+        try:
+            candidate = datetime.date(year, month, day)
+        except ValueError:
+            continue
+        if candidate >= today:
+            return candidate
+    return None
+
+
+def _parse_date(date_str, today):
+    match = _DATE_RE.search(date_str)
+    if not match:
+        return None
+
+    if match.group('relative'):
+        key = re.sub(r'\s+', ' ', match.group('relative'))
+        return today + datetime.timedelta(days=RELATIVE_DAYS[key])
+
+    if match.group('in_days'):
+        return today + datetime.timedelta(days=int(match.group('offset')))
+
+    if match.group('weekday'):
+        days_ahead = (WEEKDAYS[match.group('weekday')] - today.weekday()) % 7
+        if match.group('next') and days_ahead == 0:
+            days_ahead = 7
+        return today + datetime.timedelta(days=days_ahead)
+
+    if match.group('dm_month'):
+        return _upcoming(today, MONTHS[match.group('dm_month')], int(match.group('dm_day')))
+
+    if match.group('md_month'):
+        return _upcoming(today, MONTHS[match.group('md_month')], int(match.group('md_day')))
+
+    # Numeric dates are read day-first unless that is impossible
+    first, second = int(match.group('num_a')), int(match.group('num_b'))
+    day, month = (second, first) if first <= 12 < second else (first, second)
+    if match.group('num_year'):
+        year = int(match.group('num_year'))
+        if year < 100:
+            year += 2000
+        try:
+            return datetime.date(year, month, day)
+        except ValueError:
+            return None
+    return _upcoming(today, month, day)
+
+
+def _parse_time(time_str):
+    match = _MERIDIEM_TIME_RE.search(time_str)
+    if match:
+        hour = int(match.group('hour'))
+        minute = int(match.group('minute') or 0)
+        meridiem = match.group('meridiem') or _DAY_PART_MERIDIEM[match.group('day_part')]
+        if not 1 <= hour <= 12 or minute > 59:
+            return None
+        return datetime.time(hour % 12 + (12 if meridiem == 'p' else 0), minute)
+
+    match = _NAMED_TIME_RE.search(time_str)
+    if match:
+        return _NAMED_TIMES[match.group('named')]
+
+    match = _BARE_TIME_RE.fullmatch(time_str)
+    if not match:
+        return None
+    hour = int(match.group('hour'))
+    minute = int(match.group('minute') or 0)
+    if hour > 23 or minute > 59:
+        return None
+    return datetime.time(hour, minute)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_cached(date_str, time_str, today):
+    # 'today' is part of the key so relative terms never go stale
+    target_date = _parse_date(date_str, today) or today + datetime.timedelta(days=1)
+    time_obj = _parse_time(time_str) or DEFAULT_TIME
+    return datetime.datetime.combine(target_date, time_obj)
+
+
+def _today_in(timezone_name):
+    try:
+        return datetime.datetime.now(ZoneInfo(timezone_name)).date()
+    except (ZoneInfoNotFoundError, ValueError) as e:
+        # No tz database (e.g. Windows without tzdata) or an unknown zone:
+        # keep the parsed date and time, relative to the local date
+        print(f"Unknown timezone {timezone_name!r}, using local date: {e}")
+        return datetime.date.today()
+
+
+def parse_date_time(date_str, time_str, timezone_name=DEFAULT_TIMEZONE):
+    """Parse free-text demo date and time into a naive datetime in timezone_name.
+
+    Unrecognised dates fall back to tomorrow and unrecognised times to 10:00.
+    """
+    try:
+        today = _today_in(timezone_name)
+        return _parse_cached(date_str.strip().lower(), time_str.strip().lower(), today)
+    except Exception as e:
+        print(f"Error parsing date/time: {e}")
+        return datetime.datetime.now() + datetime.timedelta(days=1, hours=10)
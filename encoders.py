@@ -0,0 +1,149 @@
+"""Question/chunk encoders for find_relevant_chunks.
+
+The default backend is SentenceTransformer on PyTorch. The 'onnx' and
+'onnx-int8' backends export the same model to ONNX once (optionally with
+dynamic int8 quantization) and run it with ONNX Runtime, which is several
+times cheaper per question on CPU. Exported files are cached under
+ONNX_EXPORT_DIR.
+"""
+import os
+import json
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+ONNX_EXPORT_DIR = 'onnx_models'
+BACKENDS = ('sentence-transformers', 'onnx', 'onnx-int8')
+
+
+def default_thread_count():
+    """Split the machine's cores between the web workers sharing it."""
+    workers = int(os.environ.get('WEB_CONCURRENCY', '1'))
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def export_onnx(model_name=MODEL_NAME, export_dir=ONNX_EXPORT_DIR, quantize=False):
+    """Export model_name to ONNX and return the path of the .onnx file."""
+    model_dir = os.path.join(export_dir, model_name)
+    fp32_path = os.path.join(model_dir, 'model.onnx')
+    int8_path = os.path.join(model_dir, 'model-int8.onnx')
+
+    if not os.path.exists(fp32_path):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        print(f"Exporting {model_name} to ONNX...")
+        st_model = SentenceTransformer(model_name, device='cpu')
+        transformer = st_model[0].auto_model.eval()
+        tokenizer = st_model.tokenizer
+
+        os.makedirs(model_dir, exist_ok=True)
+        tokenizer.save_pretrained(model_dir)
+        with open(os.path.join(model_dir, 'encoder.json'), 'w') as f:
+            json.dump({'max_seq_length': st_model.max_seq_length}, f)
+
+        sample = tokenizer(['example question'], return_tensors='pt')
+        input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+        dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+        dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+        with torch.no_grad():
+            torch.onnx.export(
+                transformer,
+                tuple(sample[name] for name in input_names),
+                fp32_path,
+                input_names=input_names,
+                output_names=['last_hidden_state'],
+                dynamic_axes=dynamic_axes,
+                opset_version=14
+            )
+
+    if not quantize:
+        return fp32_path
+
+    if not os.path.exists(int8_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        print(f"Quantizing {model_name} to int8...")
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    return int8_path
+
+
+class OnnxEncoder:
+    """Drop-in replacement for SentenceTransformer.encode on ONNX Runtime.
+
+    Reproduces the all-MiniLM-L6-v2 pipeline: transformer, mean pooling
+    over the attention mask, then L2 normalisation.
+    """
+
+    def __init__(self, model_path, threads=None):
+        if ort is None:
+            raise RuntimeError("The onnxruntime package is required for the ONNX encoder backend")
+        from transformers import AutoTokenizer
+
+        model_dir = os.path.dirname(model_path)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        with open(os.path.join(model_dir, 'encoder.json')) as f:
+            self.max_seq_length = json.load(f)['max_seq_length']
+
+        threads = threads or default_thread_count()
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def encode(self, sentences, batch_size=32):
+        if isinstance(sentences, str):
+            return self.encode([sentences], batch_size)[0]
+
+        embeddings = []
+        for start in range(0, len(sentences), batch_size):
+            tokens = self.tokenizer(
+                list(sentences[start:start + batch_size]),
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors='np'
+            )
+            feed = {name: tokens[name].astype(np.int64) for name in self.input_names}
+            hidden = self.session.run(None, feed)[0]
+            embeddings.append(mean_pool(hidden, tokens['attention_mask']))
+
+        if not embeddings:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(embeddings)
+
+
+def mean_pool(hidden, attention_mask):
+    mask = attention_mask[..., np.newaxis].astype(np.float32)
+    pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+    return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+
+def load_encoder(backend='sentence-transformers', model_name=MODEL_NAME, threads=None):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown encoder backend {backend!r}, expected one of {BACKENDS}")
+
+    if backend == 'sentence-transformers':
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(model_name)
+
+    model_path = export_onnx(model_name, quantize=backend == 'onnx-int8')
+    return OnnxEncoder(model_path, threads)
+
+
+def embedding_parity(reference, candidate):
+    """Row-wise cosine similarity between two embedding matrices."""
+    reference = np.asarray(reference, dtype=np.float32)
+    candidate = np.asarray(candidate, dtype=np.float32)
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    return (reference * candidate).sum(axis=1)
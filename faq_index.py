@@ -0,0 +1,157 @@
+"""Precomputed answers for predictable questions about the source PDF.
+
+At ingest time a fixed set of canonical questions is answered once,
+offline with Gemini when a key is configured, otherwise with
+generate_rule_based_answer. Questions that no rule covers are left out
+rather than stored as a generic extract. The questions are embedded and
+saved with the answers, the SHA-256 of the PDF, the encoder backend and
+the answer source. At runtime an exact or high-similarity match returns
+the stored answer before any chunk search or Gemini call. The index is
+rebuilt whenever any of those change.
+
+Rebuild offline, with Gemini or rule-based answers (by default the
+app's FAQ_USE_LLM setting decides):
+
+    python faq_index.py --use-llm
+    python faq_index.py --rules
+"""
+import os
+import json
+import hashlib
+import argparse
+
+import numpy as np
+
+from conversation import normalize_question
+
+FAQ_INDEX_PATH = 'faq_index.json'
+MATCH_THRESHOLD = 0.85
+
+FAQ_TEMPLATES = [
+    "What is {product}?",
+    "What does {product} do?",
+    "What features does {product} offer?",
+    "What are the benefits of {product}?",
+    "How can {product} help my business?",
+    "Who is {product} for?",
+    "How much does {product} cost?",
+    "Does {product} support GST billing?",
+    "Does {product} have inventory management?",
+    "Can I use {product} on mobile?",
+    "Does {product} offer a free trial?",
+    "Is my data secure with {product}?",
+    "How do I get started with {product}?",
+    "How can I contact {product} support?",
+]
+
+# Answers that only say the PDF had nothing useful are not worth storing
+UNANSWERED_MARKERS = ("couldn't find relevant information", "don't have enough information")
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def canonical_questions(pdf_path):
+    product = os.path.splitext(os.path.basename(pdf_path))[0].replace('_', ' ').title()
+    return [template.format(product=product) for template in FAQ_TEMPLATES]
+
+
+def is_answered(answer):
+    # answer is None when no rule matched or Gemini failed during the build
+    return bool(answer) and not any(marker in answer for marker in UNANSWERED_MARKERS)
+
+
+class FaqIndex:
+    def __init__(self, entries, embeddings, source_sha256, encoder):
+        self.entries = entries
+        self.source_sha256 = source_sha256
+        self.encoder = encoder
+        if entries:
+            embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(entries), -1)
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            self.embeddings = embeddings / np.clip(norms, 1e-12, None)
+        else:
+            # Saved as well, so a PDF with no answerable FAQ isn't rebuilt on every start
+            self.embeddings = np.zeros((0, 0), dtype=np.float32)
+        self._by_question = {normalize_question(entry['question']): entry for entry in entries}
+
+    @classmethod
+    def build(cls, questions, answer_question, encode, source_sha256, encoder):
+        """answer_question(question) -> (answer, chunk_ids); encode(questions) -> embeddings."""
+        entries = []
+        for question in questions:
+            answer, chunk_ids = answer_question(question)
+            if is_answered(answer):
+                entries.append({'question': question, 'answer': answer, 'chunk_ids': chunk_ids})
+        embeddings = encode([entry['question'] for entry in entries]) if entries else None
+        return cls(entries, embeddings, source_sha256, encoder)
+
+    @classmethod
+    def load(cls, path=FAQ_INDEX_PATH):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data['entries'], data['embeddings'], data['source_sha256'], data['encoder'])
+
+    def save(self, path=FAQ_INDEX_PATH):
+        # Written aside and swapped in, so workers reloading the index
+        # never read a half-written file
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump({
+                    'source_sha256': self.source_sha256,
+                    'encoder': self.encoder,
+                    'entries': self.entries,
+                    'embeddings': self.embeddings.tolist(),
+                }, f)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def is_current(self, source_sha256, encoder):
+        return self.source_sha256 == source_sha256 and self.encoder == encoder
+
+    def lookup(self, question):
+        """Exact match after normalisation; needs no embedding."""
+        return self._by_question.get(normalize_question(question))
+
+    def match(self, question_embedding, threshold=MATCH_THRESHOLD):
+        """Closest entry if its cosine similarity reaches threshold, else None."""
+        if not self.entries:
+            return None
+        question_embedding = np.asarray(question_embedding, dtype=np.float32)
+        scores = self.embeddings @ (question_embedding / np.linalg.norm(question_embedding))
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None
+        return self.entries[best]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the FAQ answer index for the source PDF")
+    answers = parser.add_mutually_exclusive_group()
+    answers.add_argument('--use-llm', dest='use_llm', action='store_const', const=True,
+                         help="Answer the FAQ questions with Gemini")
+    answers.add_argument('--rules', dest='use_llm', action='store_const', const=False,
+                         help="Answer the FAQ questions with the rule-based answers only")
+    args = parser.parse_args()
+
+    import app as chatbot
+
+    # Build locally even if RETRIEVAL_SOCKET is set for the workers
+    chatbot.retrieval_client = None
+    if args.use_llm is not None:
+        chatbot.FAQ_USE_LLM = args.use_llm
+    if not chatbot.initialize_pdf_processing(rebuild_faq=True):
+        raise SystemExit("PDF processing failed to initialize!")
+
+
+if __name__ == '__main__':
+    main()
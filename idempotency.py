@@ -0,0 +1,129 @@
+import time
+import threading
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+PENDING = '__pending__'
+
+
+class MemoryBackend:
+    """Bounded in-process TTL cache. Oldest entries are evicted first."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _purge(self, now):
+        while self._entries:
+            key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now and len(self._entries) < self.max_entries:
+                break
+            del self._entries[key]
+
+    def add(self, key, value, ttl):
+        """Store value only if key is absent. Returns True if it was stored."""
+        with self._lock:
+            now = time.monotonic()
+            self._purge(now)
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return False
+            self._entries[key] = (now + ttl, value)
+            self._entries.move_to_end(key)
+            return True
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry or entry[0] <= time.monotonic():
+                return None
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class RedisBackend:
+    """Shared backend so retries landing on another worker are still caught."""
+
+    def __init__(self, url, prefix='twilio:msg:'):
+        if redis is None:
+            raise RuntimeError("The redis package is required for a shared idempotency backend")
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.client.ping()
+        self.prefix = prefix
+
+    def add(self, key, value, ttl):
+        return bool(self.client.set(self.prefix + key, value, ex=int(ttl), nx=True))
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=int(ttl))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+
+class IdempotencyStore:
+    """Remember the response sent for each Twilio MessageSid.
+
+    begin() claims a key for processing. A repeat delivery gets the stored
+    response back; one that arrives while the first is still running waits
+    up to wait_seconds and then receives pending_response.
+    """
+
+    def __init__(self, backend=None, ttl=24 * 60 * 60, pending_ttl=120,
+                 wait_seconds=5.0, pending_response=''):
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+        self.pending_ttl = pending_ttl
+        self.wait_seconds = wait_seconds
+        self.pending_response = pending_response
+
+    def begin(self, key):
+        """Return None if key is new, otherwise the response to replay."""
+        if self.backend.add(key, PENDING, self.pending_ttl):
+            return None
+
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            value = self.backend.get(key)
+            if value is None:
+                # The first attempt failed and released the key
+                if self.backend.add(key, PENDING, self.pending_ttl):
+                    return None
+                continue
+            if value != PENDING:
+                return value
+            if time.monotonic() >= deadline:
+                return self.pending_response
+            time.sleep(0.05)
+
+    def complete(self, key, response):
+        self.backend.set(key, response, self.ttl)
+
+    def abandon(self, key):
+        """Release a claimed key so a retry can process the message again."""
+        self.backend.delete(key)
+
+
+def create_store(redis_url=None, **kwargs):
+    if redis_url:
+        try:
+            return IdempotencyStore(RedisBackend(redis_url), **kwargs)
+        except Exception as e:
+            print(f"Error connecting idempotency backend, using in-memory cache: {e}")
+    return IdempotencyStore(**kwargs)
@@ -0,0 +1,95 @@
+import time
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+
+class Metrics:
+    """Thread-safe counters exposed on /metrics."""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def inc(self, name, amount=1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+class SenderRateLimiter:
+    """Token bucket per sender: `rate` tokens per second, bursts up to `capacity`.
+
+    Only the most recently active max_senders buckets are kept; an evicted
+    sender simply starts again with a full bucket.
+    """
+
+    def __init__(self, rate=0.2, capacity=5, max_senders=10000):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_senders = max_senders
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, sender):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(sender, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated_at) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[sender] = (tokens, now)
+            if len(self._buckets) > self.max_senders:
+                self._buckets.popitem(last=False)
+            return allowed
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight work and the number of requests allowed to wait for it.
+
+    Requests beyond max_queue, or that wait longer than queue_timeout, are
+    rejected rather than queued.
+    """
+
+    def __init__(self, max_concurrent=8, max_queue=16, queue_timeout=2.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+
+    @contextmanager
+    def slot(self):
+        """Yield True while holding a slot, or False if the request was shed."""
+        acquired = self._slots.acquire(blocking=False)
+        if not acquired:
+            with self._lock:
+                queue_full = self.waiting >= self.max_queue
+                if not queue_full:
+                    self.waiting += 1
+            if queue_full:
+                yield False
+                return
+            try:
+                acquired = self._slots.acquire(timeout=self.queue_timeout)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+            if not acquired:
+                yield False
+                return
+
+        with self._lock:
+            self.in_flight += 1
+        try:
+            yield True
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
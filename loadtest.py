@@ -0,0 +1,300 @@
+"""Capacity test for the WhatsApp webhook.
+
+Start the app with Gemini, Postgres and Google Calendar replaced by local
+stubs (the PDF search still runs for real):
+
+    python loadtest.py serve --port 8080 --gemini-latency 1.5
+
+Then drive it with simulated WhatsApp users, stepping up concurrency:
+
+    python loadtest.py run --url http://localhost:8080/webhook --concurrency 10,100,500,2000
+
+Each simulated user walks the real conversation (name, email, business,
+demo choice, optional demo date/time, questions, bye) with random think
+times between messages. Shed and rate-limited questions still get HTTP
+200, so their counts are read from the app's /metrics before and after
+each level. Requests carry a fresh MessageSid and an
+X-Twilio-Signature computed from TWILIO_AUTH_TOKEN like Twilio does.
+Thousands of concurrent users need a raised open-file limit (ulimit -n).
+"""
+import os
+import hmac
+import json
+import time
+import uuid
+import base64
+import random
+import tempfile
+import asyncio
+import hashlib
+import argparse
+import datetime
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+
+TWILIO_TIMEOUT_SECONDS = 15
+WHATSAPP_TO = 'whatsapp:+14155238886'
+
+QUESTIONS = [
+    "What is Invock?",
+    "What features does Invock offer?",
+    "How does inventory management work?",
+    "How much does it cost?",
+    "Does it support GST billing?",
+    "Can I use it on mobile?",
+    "What are the benefits for my business?",
+    "Tell me more about it",
+]
+DEMO_DATES = ["Monday", "next Friday", "tomorrow", "15th March", "25/12"]
+DEMO_TIMES = ["10:00 AM", "2:30 PM", "11am", "16:00"]
+# /metrics counters for questions answered with a degraded (but HTTP 200) reply
+DEGRADED_COUNTERS = ('questions_shed', 'questions_rate_limited')
+
+
+def twilio_signature(auth_token, url, params):
+    """X-Twilio-Signature: base64 HMAC-SHA1 of the URL plus the sorted POST params."""
+    payload = url + ''.join(f"{key}{params[key]}" for key in sorted(params))
+    digest = hmac.new(auth_token.encode('utf-8'), payload.encode('utf-8'), hashlib.sha1).digest()
+    return base64.b64encode(digest).decode('ascii')
+
+
+def conversation_script(rng, demo_probability, questions_per_user):
+    """Messages a simulated user sends, in order, following the webhook steps."""
+    user_id = rng.randrange(10 ** 6)
+    messages = ["Hi", f"Load Test {user_id}", f"user{user_id}@example.com", f"Business {user_id}"]
+    if rng.random() < demo_probability:
+        messages += ["yes", rng.choice(DEMO_DATES), rng.choice(DEMO_TIMES)]
+    else:
+        messages.append("no")
+    messages += rng.sample(QUESTIONS, min(questions_per_user, len(QUESTIONS)))
+    messages.append("bye")
+    return messages
+
+
+class Stage:
+    def __init__(self, concurrency):
+        self.concurrency = concurrency
+        self.latencies = []
+        self.statuses = {}
+        self.errors = 0
+        self.started = time.monotonic()
+        self.finished = None
+
+    def record(self, latency, status):
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status != 200:
+            self.errors += 1
+
+    def report(self):
+        elapsed = (self.finished or time.monotonic()) - self.started
+        requests = len(self.latencies)
+        latencies = np.array(self.latencies or [0.0]) * 1000
+        return {
+            'concurrency': self.concurrency,
+            'requests': requests,
+            'throughput_rps': requests / elapsed if elapsed else 0.0,
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p95_ms': float(np.percentile(latencies, 95)),
+            'p99_ms': float(np.percentile(latencies, 99)),
+            'error_rate': self.errors / requests if requests else 0.0,
+            'over_twilio_timeout': int((latencies > TWILIO_TIMEOUT_SECONDS * 1000).sum()),
+            'statuses': {str(key): value for key, value in sorted(self.statuses.items(), key=str)},
+        }
+
+
+async def http_request(method, url, params=None, headers=None, timeout=30):
+    """Minimal HTTP/1.1 client; returns (status code, body bytes)."""
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == 'https' else 80)
+    body = urlencode(params).encode('utf-8') if params is not None else b''
+    head = [
+        f"{method} {parts.path or '/'} HTTP/1.1",
+        f"Host: {parts.netloc}",
+        f"Content-Length: {len(body)}",
+        "Connection: close",
+    ] + [f"{key}: {value}" for key, value in (headers or {}).items()]
+    if params is not None:
+        head.append("Content-Type: application/x-www-form-urlencoded")
+
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(parts.hostname, port, ssl=parts.scheme == 'https'), timeout)
+    try:
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + body)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    # Raises IndexError/ValueError if the server hung up without a valid status line
+    status = int(response.split(b"\r\n", 1)[0].split()[1])
+    return status, response.partition(b"\r\n\r\n")[2]
+
+
+async def fetch_counters(metrics_url, timeout):
+    """Counters from the app's /metrics endpoint, or None if unavailable."""
+    try:
+        status, body = await http_request('GET', metrics_url, timeout=timeout)
+        if status != 200:
+            return None
+        return json.loads(body)['counters']
+    except (OSError, asyncio.TimeoutError, IndexError, ValueError, KeyError):
+        return None
+
+
+async def simulated_user(url, auth_token, stage, deadline, options, rng):
+    while time.monotonic() < deadline:
+        from_number = f"whatsapp:+1555{rng.randrange(10 ** 7):07d}"
+        for body in conversation_script(rng, options.demo_probability, options.questions):
+            if time.monotonic() >= deadline:
+                return
+            params = {
+                'MessageSid': 'SM' + uuid.uuid4().hex,
+                'AccountSid': 'AC' + '0' * 32,
+                'From': from_number,
+                'To': WHATSAPP_TO,
+                'Body': body,
+                'NumMedia': '0',
+            }
+            headers = {'X-Twilio-Signature': twilio_signature(auth_token, url, params)}
+            start = time.monotonic()
+            try:
+                status, _ = await http_request('POST', url, params, headers, options.timeout)
+            except asyncio.TimeoutError:
+                status = 'timeout'
+            except OSError as e:
+                status = type(e).__name__
+            except (IndexError, ValueError):
+                status = 'bad_response'
+            stage.record(time.monotonic() - start, status)
+            await asyncio.sleep(rng.uniform(options.think_min, options.think_max))
+
+
+async def run_stage(url, auth_token, concurrency, options):
+    # Shed and rate-limited replies are still HTTP 200, so count them from /metrics
+    before = await fetch_counters(options.metrics_url, options.timeout)
+    stage = Stage(concurrency)
+    deadline = time.monotonic() + options.duration
+    rng = random.Random(options.seed + concurrency)
+    users = [simulated_user(url, auth_token, stage, deadline, options, random.Random(rng.random()))
+             for _ in range(concurrency)]
+    await asyncio.gather(*users)
+    stage.finished = time.monotonic()
+    after = await fetch_counters(options.metrics_url, options.timeout)
+
+    report = stage.report()
+    for counter in DEGRADED_COUNTERS:
+        if before is None or after is None:
+            report[counter] = None
+        else:
+            report[counter] = after.get(counter, 0) - before.get(counter, 0)
+    return report
+
+
+def print_report(results):
+    print(f"{'users':>6} {'reqs':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'errors':>7} {'>15s':>5} {'shed':>6} {'limited':>7}")
+    for row in results:
+        shed, limited = ('-' if row[counter] is None else row[counter] for counter in DEGRADED_COUNTERS)
+        print(f"{row['concurrency']:>6} {row['requests']:>7} {row['throughput_rps']:>8.1f} "
+              f"{row['p50_ms']:>8.0f} {row['p95_ms']:>8.0f} {row['p99_ms']:>8.0f} "
+              f"{row['error_rate']:>7.2%} {row['over_twilio_timeout']:>5} {shed:>6} {limited:>7}")
+
+
+def run(options):
+    auth_token = os.environ.get('TWILIO_AUTH_TOKEN', 'loadtest-token')
+    results = []
+    for concurrency in options.concurrency:
+        print(f"Running {concurrency} simulated users for {options.duration}s...")
+        row = asyncio.run(run_stage(options.url, auth_token, concurrency, options))
+        results.append(row)
+        print_report([row])
+        if row['p95_ms'] > TWILIO_TIMEOUT_SECONDS * 1000:
+            print(f"p95 exceeds Twilio's {TWILIO_TIMEOUT_SECONDS}s timeout, stopping")
+            break
+
+    print()
+    print_report(results)
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Report written to {options.output}")
+
+
+class StubGeminiModel:
+    latency = 0.0
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def generate_content(self, prompt):
+        time.sleep(self.latency)
+        return type('StubResponse', (), {'text': "Invock helps businesses manage inventory and billing."})()
+
+
+def serve(options):
+    import app as chatbot
+
+    def stub_db(*args, **kwargs):
+        time.sleep(options.db_latency)
+
+    def stub_calendar(name, email, business_name, demo_date, demo_time, from_number=''):
+        time.sleep(options.calendar_latency)
+        timezone_name = chatbot.timezone_for_number(from_number)
+        event_datetime = chatbot.parse_date_time(demo_date, demo_time, timezone_name)
+        return True, f"Event created (stub): {event_datetime.isoformat()} {timezone_name}"
+
+    StubGeminiModel.latency = options.gemini_latency
+    chatbot.genai.GenerativeModel = StubGeminiModel
+    chatbot.create_table = stub_db
+    chatbot.save_user_data = stub_db
+    chatbot.create_calendar_event = stub_calendar
+    # Stub answers must never reach the real FAQ index: build a rule-based
+    # one in a scratch file instead
+    chatbot.FAQ_USE_LLM = False
+    chatbot.FAQ_INDEX_PATH = os.path.join(tempfile.mkdtemp(prefix='loadtest-'), 'faq_index.json')
+
+    print("Initializing PDF processing...")
+    if not chatbot.initialize_pdf_processing(load_model=chatbot.retrieval_client is None):
+        print("Warning: PDF processing failed to initialize!")
+
+    print(f"{datetime.datetime.now():%H:%M:%S} Serving stubbed app on port {options.port}")
+    chatbot.app.run(host='0.0.0.0', port=options.port, threaded=True, debug=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Drive a running webhook with simulated users")
+    run_parser.add_argument('--url', default='http://localhost:8080/webhook')
+    run_parser.add_argument('--metrics-url', help="Defaults to /metrics on the webhook's host")
+    run_parser.add_argument('--concurrency', default='10,50,100,250,500,1000',
+                            type=lambda value: [int(level) for level in value.split(',')])
+    run_parser.add_argument('--duration', type=float, default=60, help="Seconds per concurrency level")
+    run_parser.add_argument('--think-min', type=float, default=1.0)
+    run_parser.add_argument('--think-max', type=float, default=8.0)
+    run_parser.add_argument('--questions', type=int, default=3, help="Questions per simulated user")
+    run_parser.add_argument('--demo-probability', type=float, default=0.5)
+    run_parser.add_argument('--timeout', type=float, default=30)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--output', help="Write the report as JSON")
+
+    serve_parser = commands.add_parser('serve', help="Run app.py with Gemini/Postgres/Calendar stubbed")
+    serve_parser.add_argument('--port', type=int, default=8080)
+    serve_parser.add_argument('--gemini-latency', type=float, default=1.0)
+    serve_parser.add_argument('--db-latency', type=float, default=0.01)
+    serve_parser.add_argument('--calendar-latency', type=float, default=0.3)
+
+    options = parser.parse_args()
+    if options.command == 'run':
+        if not options.metrics_url:
+            parts = urlsplit(options.url)
+            options.metrics_url = f"{parts.scheme}://{parts.netloc}/metrics"
+        run(options)
+    else:
+        serve(options)
+
+
+if __name__ == '__main__':
+    main()
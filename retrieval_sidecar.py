@@ -0,0 +1,297 @@
+"""Shared retrieval process for multi-worker deployments.
+
+One sidecar loads the SentenceTransformer model, the PDF embeddings and
+the FAQ index and answers embed+search and embed+FAQ-match requests from
+every web worker over a Unix socket. Requests arriving close together are
+encoded as a single batch.
+
+    python retrieval_sidecar.py --socket /tmp/chatbot-retrieval.sock
+    RETRIEVAL_SOCKET=/tmp/chatbot-retrieval.sock gunicorn -w 8 app:app
+
+Workers load the chunk text and FAQ index on their first request, and
+reload them when the sidecar rewrites the index.
+
+Wire format (network byte order):
+    request:  op u8 | top_k u16 | question length u32 | question utf-8
+    response: status u8 | result count u16
+              then per search result: chunk index u32 | similarity f32 | text length u32 | text utf-8
+              or per FAQ match (at most one): answer length u32 | answer utf-8
+                                              | chunk count u16 | chunk index u32 each
+              or, for an error: message length u32 | message utf-8
+"""
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import argparse
+
+import numpy as np
+
+REQUEST_HEADER = struct.Struct('!BHI')
+RESPONSE_HEADER = struct.Struct('!BH')
+RESULT_HEADER = struct.Struct('!IfI')
+LENGTH = struct.Struct('!I')
+COUNT = struct.Struct('!H')
+CHUNK_INDEX = struct.Struct('!I')
+
+OP_SEARCH = 1
+OP_FAQ = 2
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+DEFAULT_SOCKET = '/tmp/chatbot-retrieval.sock'
+MAX_QUESTION_BYTES = 64 * 1024
+
+
+def recv_exact(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        packet = sock.recv(size - len(data))
+        if not packet:
+            raise ConnectionError("Retrieval socket closed mid-message")
+        data.extend(packet)
+    return bytes(data)
+
+
+class RetrievalClient:
+    """Client used by find_relevant_chunks when RETRIEVAL_SOCKET is set.
+
+    Each thread keeps its own persistent connection to the sidecar.
+    """
+
+    def __init__(self, socket_path, timeout=10.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def search(self, question, top_k=5):
+        return self._request(OP_SEARCH, top_k, question, self._read_chunk)
+
+    def match_faq(self, question):
+        """Stored FAQ entry ({'answer', 'chunk_ids'}) matching question, or None"""
+        results = self._request(OP_FAQ, 0, question, self._read_faq_entry)
+        return results[0] if results else None
+
+    def _request(self, op, top_k, question, read_result):
+        payload = question.encode('utf-8')
+        request = REQUEST_HEADER.pack(op, top_k, len(payload)) + payload
+
+        # A stale connection (e.g. sidecar restarted) gets one reconnect.
+        # Timeouts are not retried: the sidecar is busy, and a second wait
+        # would outlast Twilio's webhook timeout.
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                sock.sendall(request)
+                return self._read_response(sock, read_result)
+            except (ConnectionError, FileNotFoundError):
+                self._close()
+                if attempt:
+                    raise
+            except OSError:
+                self._close()
+                raise
+
+    def _read_response(self, sock, read_result):
+        status, count = RESPONSE_HEADER.unpack(recv_exact(sock, RESPONSE_HEADER.size))
+        if status != STATUS_OK:
+            (length,) = LENGTH.unpack(recv_exact(sock, LENGTH.size))
+            raise RuntimeError(recv_exact(sock, length).decode('utf-8'))
+        return [read_result(sock) for _ in range(count)]
+
+    @staticmethod
+    def _read_chunk(sock):
+        index, similarity, length = RESULT_HEADER.unpack(recv_exact(sock, RESULT_HEADER.size))
+        return {
+            'index': index,
+            'text': recv_exact(sock, length).decode('utf-8'),
+            'similarity': similarity
+        }
+
+    @staticmethod
+    def _read_faq_entry(sock):
+        (length,) = LENGTH.unpack(recv_exact(sock, LENGTH.size))
+        answer = recv_exact(sock, length).decode('utf-8')
+        (count,) = COUNT.unpack(recv_exact(sock, COUNT.size))
+        chunk_ids = [CHUNK_INDEX.unpack(recv_exact(sock, CHUNK_INDEX.size))[0] for _ in range(count)]
+        return {'answer': answer, 'chunk_ids': chunk_ids}
+
+
+class PendingSearch:
+    def __init__(self, op, question, top_k):
+        self.op = op
+        self.question = question
+        self.top_k = top_k
+        self.results = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class SearchBatcher:
+    """Collects searches and FAQ matches from all connections and encodes them together.
+
+    match_faq(question, question_embedding) returns the stored FAQ entry or None.
+    """
+
+    def __init__(self, model, chunk_embeddings, select_chunks, match_faq, max_batch=32, max_wait=0.005):
+        self.model = model
+        embeddings = np.asarray(chunk_embeddings, dtype=np.float32)
+        self.normalized = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        self.select_chunks = select_chunks
+        self.match_faq = match_faq
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def search(self, question, top_k):
+        return self._submit(OP_SEARCH, question, top_k)
+
+    def faq(self, question):
+        entry = self._submit(OP_FAQ, question, 0)
+        return [entry] if entry is not None else []
+
+    def _submit(self, op, question, top_k):
+        pending = PendingSearch(op, question, top_k)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.results
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get(timeout=self.max_wait))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                questions = self.model.encode([pending.question for pending in batch])
+                questions = np.asarray(questions, dtype=np.float32)
+                questions /= np.linalg.norm(questions, axis=1, keepdims=True)
+                similarities = questions @ self.normalized.T
+                for pending, embedding, row in zip(batch, questions, similarities):
+                    if pending.op == OP_FAQ:
+                        pending.results = self.match_faq(pending.question, embedding)
+                    else:
+                        pending.results = self.select_chunks(row, pending.top_k)
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            for pending in batch:
+                pending.done.set()
+
+
+class RetrievalHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                header = recv_exact(self.request, REQUEST_HEADER.size)
+            except ConnectionError:
+                return
+            op, top_k, length = REQUEST_HEADER.unpack(header)
+            if op not in (OP_SEARCH, OP_FAQ) or length > MAX_QUESTION_BYTES:
+                self.send_error(f"Bad request: op={op} length={length}")
+                return
+
+            question = recv_exact(self.request, length).decode('utf-8')
+            try:
+                if op == OP_FAQ:
+                    entries = self.server.batcher.faq(question)
+                    response = [self.pack_faq_entry(entry) for entry in entries]
+                else:
+                    entries = self.server.batcher.search(question, top_k)
+                    response = [self.pack_chunk(chunk) for chunk in entries]
+            except Exception as e:
+                print(f"Error searching for {question!r}: {e}")
+                self.send_error(str(e))
+                continue
+
+            self.request.sendall(RESPONSE_HEADER.pack(STATUS_OK, len(entries)) + b''.join(response))
+
+    @staticmethod
+    def pack_chunk(chunk):
+        text = chunk['text'].encode('utf-8')
+        return RESULT_HEADER.pack(chunk['index'], float(chunk['similarity']), len(text)) + text
+
+    @staticmethod
+    def pack_faq_entry(entry):
+        answer = entry['answer'].encode('utf-8')
+        chunk_ids = b''.join(CHUNK_INDEX.pack(idx) for idx in entry['chunk_ids'])
+        return LENGTH.pack(len(answer)) + answer + COUNT.pack(len(entry['chunk_ids'])) + chunk_ids
+
+    def send_error(self, message):
+        message = message.encode('utf-8')
+        self.request.sendall(RESPONSE_HEADER.pack(STATUS_ERROR, 0) + LENGTH.pack(len(message)) + message)
+
+
+class RetrievalServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, socket_path, batcher):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, RetrievalHandler)
+        self.batcher = batcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve PDF embedding search to chatbot workers")
+    parser.add_argument('--socket', default=os.environ.get('RETRIEVAL_SOCKET', DEFAULT_SOCKET))
+    parser.add_argument('--max-batch', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 1,
+                        help="ONNX Runtime threads; the sidecar is the only process encoding")
+    args = parser.parse_args()
+
+    import app as chatbot
+
+    # This process owns the model; never forward searches to itself
+    chatbot.retrieval_client = None
+    print("Initializing PDF processing...")
+    if not chatbot.initialize_pdf_processing(encoder_threads=args.threads):
+        raise SystemExit("PDF processing failed to initialize!")
+
+    batcher = SearchBatcher(
+        chatbot.model,
+        chatbot.pdf_embeddings,
+        chatbot.select_relevant_chunks,
+        chatbot.find_faq_entry,
+        max_batch=args.max_batch,
+        max_wait=args.max_wait_ms / 1000
+    )
+    server = RetrievalServer(args.socket, batcher)
+    print(f"Retrieval sidecar listening on {args.socket}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.remove(args.socket)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+import datetime
+
+import pytest
+
+from date_parser import _parse_date, _parse_time, parse_date_time, timezone_for_number
+
+# A Monday
+TODAY = datetime.date(2026, 10, 19)
+
+
+@pytest.mark.parametrize('time_str, expected', [
+    ('10:00 am', datetime.time(10, 0)),
+    ('2:30 pm', datetime.time(14, 30)),
+    ('11am', datetime.time(11, 0)),
+    ('7.30 p.m.', datetime.time(19, 30)),
+    ('5 30 pm', datetime.time(17, 30)),
+    ('around 5 in the evening', datetime.time(17, 0)),
+    ('16:00', datetime.time(16, 0)),
+    ('9', datetime.time(9, 0)),
+    ('noon', datetime.time(12, 0)),
+])
+def test_parse_time(time_str, expected):
+    assert _parse_time(time_str) == expected
+
+
+@pytest.mark.parametrize('time_str', ['at 3', 'in 2 hours', '2 hours', '13 pm', 'whenever'])
+def test_parse_time_ignores_stray_numbers(time_str):
+    assert _parse_time(time_str) is None
+
+
+@pytest.mark.parametrize('date_str, expected', [
+    ('monday', datetime.date(2026, 10, 19)),
+    ('next monday', datetime.date(2026, 10, 26)),
+    ('friday', datetime.date(2026, 10, 23)),
+    ('tomorrow', datetime.date(2026, 10, 20)),
+    ('day after tomorrow', datetime.date(2026, 10, 21)),
+    ('in 3 days', datetime.date(2026, 10, 22)),
+    ('15th march', datetime.date(2027, 3, 15)),
+    ('march 15', datetime.date(2027, 3, 15)),
+    ('25/12', datetime.date(2026, 12, 25)),
+    ('3/25', datetime.date(2027, 3, 25)),
+])
+def test_parse_date(date_str, expected):
+    assert _parse_date(date_str, TODAY) == expected
+
+
+@pytest.mark.parametrize('date_str', ['this month', 'sunny day', 'whenever'])
+def test_parse_date_needs_whole_words(date_str):
+    assert _parse_date(date_str, TODAY) is None
+
+
+def test_unknown_timezone_keeps_parsed_date_and_time():
+    result = parse_date_time('in 3 days', '3pm', 'Bad/Zone')
+    assert result == datetime.datetime.combine(
+        datetime.date.today() + datetime.timedelta(days=3), datetime.time(15, 0))
+
+
+def test_timezone_for_number():
+    assert timezone_for_number('whatsapp:+919876543210') == 'Asia/Kolkata'
+    assert timezone_for_number('whatsapp:+14155238886') == 'America/New_York'
+    assert timezone_for_number('') == 'UTC'